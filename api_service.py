@@ -3,46 +3,99 @@ Run: python api_service.py --host 127.0.0.1 --port 8077
 
 GET /health -> {status: ok}
 GET /mouse?rfid=TAG -> denormalized JSON or {error:not_found}
+POST /invalidate -> drop cached /mouse responses (also dropped when the DB file changes)
 """
 from __future__ import annotations
-import argparse, pathlib, json
+import argparse, pathlib, json, os, threading
+from functools import lru_cache
 from typing import Optional
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import urllib.parse as up
 import db
 
-_conn = None
+try:  # optional C serializer; stdlib json otherwise
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+_OK = b'{"status":"ok"}'
+_MISSING_RFID = b'{"error":"missing_rfid"}'
+_UNKNOWN = b'{"error":"unknown_endpoint"}'
+
+# sqlite3 connections can't cross threads; each request thread opens its own
+_tls = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
 
 def get_conn():
-    global _conn
-    if _conn is None:
-        db.init()
-        _conn = db.connect()
-    return _conn
+    global _initialized
+    conn = getattr(_tls, 'conn', None)
+    if conn is None:
+        with _init_lock:
+            if not _initialized:
+                db.init()
+                _initialized = True
+        conn = _tls.conn = db.connect()
+    return conn
+
+@lru_cache(maxsize=4096)
+def _encoded_mouse(rfid: str) -> Optional[bytes]:
+    rec = db.get_mouse(get_conn(), rfid)
+    return _dumps(rec) if rec else None
+
+_db_mtime = None
+
+def _drop_stale_cache():
+    """Clear cached responses once the mirror DB has been written since the last request."""
+    global _db_mtime
+    try:
+        mtime = os.stat(db.DB_PATH).st_mtime_ns
+    except OSError:
+        return
+    if mtime != _db_mtime:
+        _encoded_mouse.cache_clear()
+        _db_mtime = mtime
 
 class Handler(BaseHTTPRequestHandler):
-    def _set(self, code=200, ctype='application/json'):
+    # HTTP/1.1 keeps client connections open between lookups
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, code: int, body: bytes, ctype='application/json'):
         self.send_response(code)
         self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
+        self.wfile.write(body)
 
     def do_GET(self):  # noqa
         parsed = up.urlparse(self.path)
         if parsed.path == '/health':
-            self._set(); self.wfile.write(b'{"status":"ok"}')
+            self._send(200, _OK)
             return
         if parsed.path == '/mouse':
             qs = up.parse_qs(parsed.query)
             rfid = qs.get('rfid', [None])[0]
             if not rfid:
-                self._set(400); self.wfile.write(b'{"error":"missing_rfid"}')
+                self._send(400, _MISSING_RFID)
                 return
-            rec = db.get_mouse(get_conn(), rfid)
-            if not rec:
-                self._set(404); self.wfile.write(json.dumps({'error':'not_found','rfid':rfid}).encode())
+            _drop_stale_cache()
+            body = _encoded_mouse(rfid)
+            if body is None:
+                self._send(404, b'{"error":"not_found","rfid":' + _dumps(rfid) + b'}')
                 return
-            self._set(200); self.wfile.write(json.dumps(rec).encode()); return
-        self._set(404); self.wfile.write(b'{"error":"unknown_endpoint"}')
+            self._send(200, body); return
+        self._send(404, _UNKNOWN)
+
+    def do_POST(self):  # noqa
+        # Drain any body so the kept-alive connection stays in sync
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if up.urlparse(self.path).path == '/invalidate':
+            _encoded_mouse.cache_clear()
+            self._send(200, _OK)
+            return
+        self._send(404, _UNKNOWN)
 
 
 def main(argv=None):
@@ -50,7 +103,7 @@ def main(argv=None):
     ap.add_argument('--host', default='127.0.0.1')
     ap.add_argument('--port', type=int, default=8077)
     args = ap.parse_args(argv)
-    srv = HTTPServer((args.host, args.port), Handler)
+    srv = ThreadingHTTPServer((args.host, args.port), Handler)
     print(f'RFID metadata service listening on http://{args.host}:{args.port}')
     try:
         srv.serve_forever()
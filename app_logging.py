@@ -8,7 +8,7 @@ Usage:
 Log file: logs/app.log (rotates at ~5MB, keeps 5 backups)
 """
 from __future__ import annotations
-import logging, logging.handlers, os, pathlib
+import atexit, logging, logging.handlers, os, pathlib, queue
 
 LOG_DIR = pathlib.Path('logs')
 LOG_DIR.mkdir(exist_ok=True)
@@ -23,11 +23,16 @@ _handler.setFormatter(logging.Formatter(_FORMAT))
 _root = logging.getLogger('rfidsoftmouse')
 if not _root.handlers:
     _root.setLevel(_LEVEL)
-    _root.addHandler(_handler)
     # Also echo to stdout for dev
     stream = logging.StreamHandler()
     stream.setFormatter(logging.Formatter(_FORMAT))
-    _root.addHandler(stream)
+    # QueueHandler.prepare() still formats on the calling thread (incl. the GUI thread);
+    # only the file/stream writes and rotation move to the listener thread
+    _queue = queue.SimpleQueue()
+    _root.addHandler(logging.handlers.QueueHandler(_queue))
+    _listener = logging.handlers.QueueListener(_queue, _handler, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
 
 
 def get_logger(name: str | None = None) -> logging.Logger:
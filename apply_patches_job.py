@@ -9,28 +9,32 @@ Current placeholder simply lists pending patches.
 """
 from __future__ import annotations
 import json, pathlib
-from writeback_queue import load_all, mark_processed
+from writeback_queue import iter_pending, mark_processed_many
 
 QUEUE_FILE = pathlib.Path('writeback_queue.jsonl')
 
 def main(dry_run: bool = True):
-    patches = [p for p in load_all() if p.get('status') == 'pending']
-    if not patches:
-        print('No pending patches.')
-        return
-    print(f'{len(patches)} pending patch(es):')
-    for p in patches:
+    # Stream the queue; results are written back in one rewrite once the read handle is closed
+    results = []
+    count = 0
+    for p in iter_pending():
+        count += 1
         print(json.dumps(p))
         if not dry_run:
             # Placeholder success path
             success = True
             if success:
-                mark_processed(p['rfid'], p['op'], 'done')
+                results.append((p['rfid'], p['op'], 'done', None))
             else:
-                mark_processed(p['rfid'], p['op'], 'error', 'placeholder failure')
+                results.append((p['rfid'], p['op'], 'error', 'placeholder failure'))
+    if not count:
+        print('No pending patches.')
+        return
+    print(f'{count} pending patch(es).')
     if dry_run:
         print('\nDry run only. Re-run with PYTHONUNBUFFERED=1 python apply_patches_job.py run to mark processed.')
     else:
+        mark_processed_many(results)
         print('Processing complete.')
 
 if __name__ == '__main__':
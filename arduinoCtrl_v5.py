@@ -13,12 +13,13 @@ import time
 import serial
         
 class arduinoCtrl(Process):
-    def __init__(self, ardq, ardq_p2read, frm, com, is_busy, mVal, stim_status, stim_selection, del_style):
+    def __init__(self, ardq, ardq_p2read, frm, com, com_done, is_busy, mVal, stim_status, stim_selection, del_style):
         super().__init__()
         self.ardq = ardq
         self.ardq_p2read = ardq_p2read
         self.frm = frm
         self.com = com
+        self.com_done = com_done
         self.is_busy = is_busy
         self.mVal = mVal
         self.stim_status = stim_status
@@ -97,6 +98,8 @@ class arduinoCtrl(Process):
                         if self.record:
                             self.events.close()
                             self.record = False
+                        # Ack only once the events file is closed so the GUI can archive it
+                        self.ardq_p2read.put('done')
                 except:
                     exc_type, exc_obj, tb = sys.exc_info()
                     f = tb.tb_frame
@@ -191,6 +194,7 @@ class arduinoCtrl(Process):
                             print('%s in %d attempt(s)' % (line,attmpt))
                             self.is_busy.value = 1;
                             self.com.value = 0
+                            self.com_done.set()
                             return
                     except:
                         pass
@@ -207,6 +211,7 @@ class arduinoCtrl(Process):
             if (time.time() > (stA + 2)):
                 print('Arduino send fail - %d - %s in %d tries' % (comVal,msg,attmpt))
                 self.com.value = 0
+                self.com_done.set()
                 return
 
 
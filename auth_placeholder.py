@@ -6,6 +6,7 @@ Purpose:
 Design:
   - Single function `verify_token(token: str) -> bool`
   - Token(s) loaded from either environment variable AUTH_TOKEN (single) or a flat text file `auth_tokens.txt` (one token per line, comments with '#').
+  - Tokens are cached and re-read only when `auth_tokens.txt` changes (mtime).
   - Intended to be imported by API services (e.g., fastapi_service.py / pg_api.py) to gate endpoints.
 
 Usage (FastAPI example):
@@ -24,48 +25,76 @@ Security Notes:
   - Replace with proper auth (OIDC, JWT, or API gateway) before external exposure.
 """
 from __future__ import annotations
-import os, pathlib
-from typing import List
+import hmac, os, pathlib
+from typing import FrozenSet, Iterator
 
 TOKENS_FILE = pathlib.Path('auth_tokens.txt')
-_cached_tokens: List[str] | None = None
+_cached_tokens: FrozenSet[str] | None = None
+_tokens_mtime: int | None = None
 
-def load_tokens() -> List[str]:
-    global _cached_tokens
-    if _cached_tokens is not None:
+def _file_mtime() -> int | None:
+    try:
+        return os.stat(TOKENS_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+def _iter_file_tokens(fh) -> Iterator[str]:
+    for line in fh:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+def load_tokens() -> FrozenSet[str]:
+    """Tokens from AUTH_TOKEN + TOKENS_FILE; re-read only when the file changes."""
+    global _cached_tokens, _tokens_mtime
+    mtime = _file_mtime()
+    if _cached_tokens is not None and mtime == _tokens_mtime:
         return _cached_tokens
     tokens = set()
     env_token = os.getenv('AUTH_TOKEN')
     if env_token:
         tokens.add(env_token.strip())
-    if TOKENS_FILE.exists():
-        for line in TOKENS_FILE.read_text(encoding='utf-8').splitlines():
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            tokens.add(line)
-    _cached_tokens = list(tokens)
+    if mtime is not None:
+        with TOKENS_FILE.open('r', encoding='utf-8') as fh:
+            tokens.update(_iter_file_tokens(fh))
+    _cached_tokens = frozenset(tokens)
+    _tokens_mtime = mtime
     return _cached_tokens
 
 
 def verify_token(token: str | None) -> bool:
     if not token:
         return False
-    return token in load_tokens()
-
-# FastAPI dependency helper (kept optional to avoid hard dependency if not used)
-try:
-    from fastapi import Header, HTTPException, Depends
-
-    def token_dependency(authorization: str | None = Header(default=None)):
-        token = None
-        if authorization and authorization.lower().startswith('bearer '):
-            token = authorization.split(None, 1)[1].strip()
-        if not verify_token(token):
-            raise HTTPException(status_code=401, detail='unauthorized')
-        return True
-except Exception:  # fastapi not installed yet
-    pass
+    # Compare against every token (no early exit) so timing doesn't reveal a partial match
+    candidate = token.encode('utf-8')
+    ok = False
+    for t in load_tokens():
+        ok |= hmac.compare_digest(candidate, t.encode('utf-8'))
+    return ok
+
+# FastAPI dependency helper. Built on first access (PEP 562 module __getattr__) so
+# processes that only need verify_token don't pay for importing fastapi/pydantic.
+_token_dependency = None
+
+def _build_fastapi_dep():
+    global _token_dependency
+    if _token_dependency is None:
+        from fastapi import Header, HTTPException
+
+        def token_dependency(authorization: str | None = Header(default=None)):
+            token = None
+            if authorization and authorization.lower().startswith('bearer '):
+                token = authorization.split(None, 1)[1].strip()
+            if not verify_token(token):
+                raise HTTPException(status_code=401, detail='unauthorized')
+            return True
+        _token_dependency = token_dependency
+    return _token_dependency
+
+def __getattr__(name: str):
+    if name == 'token_dependency':
+        return _build_fastapi_dep()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 if __name__ == '__main__':
     print('Loaded tokens:', load_tokens())
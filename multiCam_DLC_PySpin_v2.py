@@ -17,7 +17,6 @@ except ImportError:
 from math import floor
 import os, sys, linecache
 from multiprocessing import Process
-from queue import Empty
 import numpy as np
 from PIL import Image
 import multiCam_DLC_utils_v2 as clara
@@ -27,13 +26,12 @@ import ruamel.yaml
 import serial
         
 class multiCam_DLC_Cam(Process):
-    def __init__(self, camq, camq_p2read, camID,
+    def __init__(self, conn, camID,
                  idList, cpt, aq, frm, array4feed, frmGrab,
                  com, stim_status):
         super().__init__()
         self.camID = camID
-        self.camq = camq
-        self.camq_p2read = camq_p2read
+        self.conn = conn
         self.idList = idList
         self.cpt = cpt
         self.aq = aq
@@ -71,7 +69,13 @@ class multiCam_DLC_Cam(Process):
         
         while True:
             try:
-                msg = self.camq.get(block=False)
+                if not self.conn.poll(0.1):
+                    continue
+                msg = self.conn.recv()
+            except (EOFError, OSError):
+                # GUI end of the pipe was closed; nothing more will arrive
+                break
+            try:
 #                print(msg)
                 try:
                     if msg == 'InitM':
@@ -94,7 +98,7 @@ class multiCam_DLC_Cam(Process):
                         cam.TriggerSource.SetValue(PySpin.TriggerSource_Software)
                         cam.TriggerOverlap.SetValue(PySpin.TriggerOverlap_Off)
                         cam.TriggerMode.SetValue(PySpin.TriggerMode_On)
-                        self.camq_p2read.put('done')
+                        self.conn.send('done')
                     if msg == 'InitS':
                         system = PySpin.System.GetInstance()
                         cam_list = system.GetCameras()
@@ -104,16 +108,16 @@ class multiCam_DLC_Cam(Process):
                         cam.TriggerOverlap.SetValue(PySpin.TriggerOverlap_ReadOut)
                         cam.TriggerActivation.SetValue(PySpin.TriggerActivation_AnyEdge)
                         cam.TriggerMode.SetValue(PySpin.TriggerMode_On)
-                        self.camq_p2read.put('done')
+                        self.conn.send('done')
                     elif msg == 'Release':
                         cam.DeInit()
                         del cam
                         for i in self.idList:
                             cam_list.RemoveBySerial(str(i))
                         # system.ReleaseInstance() # Release instance
-                        self.camq_p2read.put('done')
+                        self.conn.send('done')
                     elif msg == 'recordPrep':
-                        proto_name = self.camq.get()
+                        proto_name = self.conn.recv()
                         totTime = 0
                             
                         if not proto_name == 'none' and isstim:
@@ -150,9 +154,9 @@ class multiCam_DLC_Cam(Process):
                             else:
                                 auto = False
                         
-                        self.camq_p2read.put(totTime)
+                        self.conn.send(totTime)
                         
-                        path_base = self.camq.get()
+                        path_base = self.conn.recv()
                         if not path_base == 'space':
                             write_frame_rate = 30
                             s_node_map = cam.GetTLStreamNodeMap()
@@ -174,14 +178,14 @@ class multiCam_DLC_Cam(Process):
                             start_time = 0
                             capture_duration = 0
                             record = True
-                            self.camq_p2read.put('done')
+                            self.conn.send('done')
                     elif msg == 'Start':
                         cam.BeginAcquisition()
                         if ismaster:
                             cam.LineSelector.SetValue(PySpin.LineSelector_Line1)
                             cam.LineSource.SetValue(PySpin.LineSource_Counter0Active)
                             self.frm.value = 0
-                            self.camq.get()
+                            self.conn.recv()
                             cam.TriggerMode.SetValue(PySpin.TriggerMode_Off)
                         if benchmark:
                             bA = 0
@@ -223,7 +227,7 @@ class multiCam_DLC_Cam(Process):
                                 bB+=time.perf_counter()-pre
                                 pre = time.perf_counter()
                             
-                        self.camq.get()
+                        self.conn.recv()
                         
                         if record:
                             if not(method == 'roi' and isstim):
@@ -242,7 +246,7 @@ class multiCam_DLC_Cam(Process):
                             cam.LineSelector.SetValue(PySpin.LineSelector_Line1)
                             cam.LineSource.SetValue(PySpin.LineSource_FrameTriggerWait)
                             cam.LineInverter.SetValue(True)
-                        self.camq_p2read.put('done')
+                        self.conn.send('done')
                     
                         
                     elif msg == 'updateSettings':
@@ -322,8 +326,8 @@ class multiCam_DLC_Cam(Process):
                         
                         # cam.AdcBitDepth.SetValue(PySpin.AdcBitDepth_Bit8)
                         
-                        self.camq_p2read.put('done')
-                        method = self.camq.get()
+                        self.conn.send('done')
+                        method = self.conn.recv()
                         if (method == 'crop') or (method == 'roi'):
 
                             dimRef = self.cpt
@@ -406,12 +410,12 @@ class multiCam_DLC_Cam(Process):
                         exposure_time_to_set = cam.ExposureTime.GetValue()
                         record_frame_rate = cam.AcquisitionFrameRate.GetValue()
                         # max_exposure = cam.ExposureTime.GetMax()
-                        # self.camq_p2read.put(exposure_time_to_set)
+                        # self.conn.send(exposure_time_to_set)
                         print('frame rate ' + user_cfg[camStr]['nickname'] + ' : ' + str(round(record_frame_rate)))
-                        # self.camq_p2read.put(max_exposure)
-                        self.camq_p2read.put(record_frame_rate)
-                        self.camq_p2read.put(width_to_set)
-                        self.camq_p2read.put(height_to_set)
+                        # self.conn.send(max_exposure)
+                        self.conn.send(record_frame_rate)
+                        self.conn.send(width_to_set)
+                        self.conn.send(height_to_set)
 
                 except PySpin.SpinnakerException as ex:
                     exc_type, exc_obj, tb = sys.exc_info()
@@ -424,14 +428,15 @@ class multiCam_DLC_Cam(Process):
                     print(ex)
                     print(f'{self.camID} : {camStr}')
                     if msg == 'updateSettings':
-                        self.camq_p2read.put(30)
-                        self.camq_p2read.put(30)
-                        self.camq_p2read.put(30)
+                        self.conn.send(30)
+                        self.conn.send(30)
+                        self.conn.send(30)
                     else:
-                        self.camq_p2read.put('done')
+                        self.conn.send('done')
             
-            except Empty:
-                pass
+            except (EOFError, BrokenPipeError, ConnectionResetError):
+                # Pipe closed mid-handshake. Not plain OSError: file errors from the handler must still surface
+                break
 
 
 
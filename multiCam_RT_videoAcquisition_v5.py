@@ -7,7 +7,8 @@ W Williamson, wallace.williamson@ucdenver.edu
 
 
 from __future__ import print_function
-from multiprocessing import Array, Queue, Value
+from multiprocessing import Array, Event, Pipe, Queue, Value
+from queue import Empty
 import wx
 import wx.lib.dialogs
 import os
@@ -22,10 +23,85 @@ import multiCam_DLC_utils_v2 as clara
 import arduinoCtrl_v5 as arduino
 import compressVideos_v3 as compressVideos
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import ruamel.yaml
 import winsound
 
+_logger = None
+
+def _log():
+    """GUI-process logger, created on first use.
+
+    Spawned camera/Arduino/compression children re-import this module, so keeping
+    app_logging out of import time stops each of them opening logs/app.log.
+    """
+    global _logger
+    if _logger is None:
+        from app_logging import get_logger
+        _logger = get_logger('acquisition_gui')
+    return _logger
+
+def _recv(conn, timeout=None):
+    """Receive a worker reply, raising queue.Empty if none arrives within timeout."""
+    if timeout is not None and not conn.poll(timeout):
+        raise Empty
+    return conn.recv()
+
+def _drain(q):
+    """Discard replies left on a worker queue, e.g. an ack that arrived after we stopped waiting."""
+    while True:
+        try:
+            q.get_nowait()
+        except Empty:
+            return
+
+def _max_session(dirpath):
+    """Highest NNN among 'sessionNNN' entries in dirpath (0 if none or missing)."""
+    maxSess = 0
+    try:
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith('session'):
+                    try:
+                        sessNum = int(name[-3:])
+                    except ValueError:
+                        continue
+                    if sessNum > maxSess:
+                        maxSess = sessNum
+    except FileNotFoundError:
+        pass
+    return maxSess
+
+def _graceful_stop(proc, soft=2.0, hard=1.0):
+    """terminate() and join a child process, escalating to kill() if it won't exit."""
+    proc.terminate()
+    proc.join(soft)
+    if proc.is_alive():
+        _log().warning('%s ignored terminate; killing', proc.name)
+        proc.kill()
+        proc.join(hard)
+
+class _PausePolling:
+    """Suspend the live-feed redraw while a modal dialog runs its own event loop."""
+    def __init__(self, frame):
+        self.frame = frame
+        
+    def __enter__(self):
+        self.prev = self.frame._polling_enabled
+        self.frame._polling_enabled = False
+        return self
+        
+    def __exit__(self, *exc):
+        self.frame._polling_enabled = self.prev
+        return False
+
+def _fetch_mouse(tag):
+    """RFID lookup run on the I/O pool; imported lazily since it pulls in requests."""
+    import rfid_lookup
+    return rfid_lookup.fetch_mouse(tag)
+
 # ###########################################################################
 # Class for GUI MainFrame
 # ###########################################################################
@@ -407,7 +483,11 @@ class MainFrame(wx.Frame):
                                  self.update_settings, self.set_pellet_pos, self.set_roi]
 
         self.liveTimer = wx.Timer(self, wx.ID_ANY)
+        self.liveRate = 150
         self.recTimer = wx.Timer(self, wx.ID_ANY)
+        self.quitTimer = wx.Timer(self, wx.ID_ANY)
+        # Cleared while a modal dialog is up so timer ticks skip the frame redraw
+        self._polling_enabled = True
         
         self.figure,self.axes,self.canvas = self.image_panel.getfigure()
         self.figure.canvas.draw()
@@ -432,6 +512,9 @@ class MainFrame(wx.Frame):
         
         self.im = list()
         self.delivery_delay = time.time()
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        self._shutting_down = False
+        self.delay_call = None
         self.frmDims = [0,270,0,360]
         self.camIDlsit = list()
         self.dlc = Value(ctypes.c_byte, 0)
@@ -439,6 +522,7 @@ class MainFrame(wx.Frame):
         self.camaq = Value(ctypes.c_byte, 0)
         self.frmaq = Value(ctypes.c_int, 0)
         self.com = Value(ctypes.c_int, -1)
+        self.com_done = Event()
         self.mVal = Value(ctypes.c_int, 0)
         self.stim_selection = Value(ctypes.c_int, 0)
         self.del_style = Value(ctypes.c_int, 0)
@@ -497,12 +581,20 @@ class MainFrame(wx.Frame):
         
         if self.stimAxes == None:
             self.auto_stim.Enable(False)
+        # (serial, config key) per camera, fixed for the life of the frame
+        self._cam_info = tuple(zip(self.camIDlsit, self.camStrList))
+        self.updatePelletAxes()
             
         self.makeUserList()
         self.figure.canvas.draw()
         
         self.alpha = 0.8
         
+        # (toggle, artists to hide, axes that must not be clicked, apply function)
+        self.roiModes = [(self.set_pellet_pos, self.pLoc, 'stimAxes', self.clickPellet),
+                         (self.set_roi, self.roirec, 'stimAxes', self.clickHandROI),
+                         (self.set_stim, self.stimrec, 'pelletAxes', self.clickStimROI),
+                         (self.set_crop, self.croprec, None, self.clickCropROI)]
         self.canvas.mpl_connect('button_press_event', self.onClick)
         self.Bind(wx.EVT_CHAR_HOOK, self.OnKeyPressed)
     
@@ -515,7 +607,9 @@ class MainFrame(wx.Frame):
             
     def addUser(self, event):
         dlg = wx.TextEntryDialog(self, 'Enter new user initials:', 'Add New User')
-        if dlg.ShowModal() == wx.ID_OK:
+        with _PausePolling(self):
+            answer = dlg.ShowModal()
+        if answer == wx.ID_OK:
             new_user = dlg.GetValue()
             usrdatadir = os.path.dirname(os.path.realpath(__file__))
             configname = os.path.join(usrdatadir, 'Users', new_user + '_userdata.yaml')
@@ -556,11 +650,17 @@ class MainFrame(wx.Frame):
                 'maxTime2Eat': 30.0
             }
             
-        self.tone_delay_min.SetValue(int(self.user_cfg['waitMin']))
-        self.tone_delay_max.SetValue(int(self.user_cfg['waitMax']))
-        self.delay_count.SetValue(int(self.user_cfg['waitCt']))
+        # Prefill the user's values with repaints batched into one
+        self.widget_panel.Freeze()
+        try:
+            for ctrl, key in ((self.tone_delay_min, 'waitMin'),
+                              (self.tone_delay_max, 'waitMax'),
+                              (self.delay_count, 'waitCt')):
+                ctrl.SetValue(int(self.user_cfg[key]))
+            self.protocol.SetSelection(self.user_cfg['protocolSelected'])
+        finally:
+            self.widget_panel.Thaw()
         self.make_delay_iters()
-        self.protocol.SetSelection(self.user_cfg['protocolSelected'])
         self.setProtocol(None)
         self.setDelStyle()
 
@@ -570,18 +670,36 @@ class MainFrame(wx.Frame):
         if not tag:
             self.statusbar.SetStatusText("No RFID entered")
             return
+        # The HTTP request / DB fallback can take seconds; run it off the GUI thread
+        self.rfid_lookup.Enable(False)
+        self.statusbar.SetStatusText(f"Looking up RFID {tag}...")
+        future = self._io_pool.submit(_fetch_mouse, tag)
+        future.add_done_callback(lambda f: wx.CallAfter(self.afterRFIDLookup, tag, f))
+        
+    def afterRFIDLookup(self, tag, future):
+        if self._shutting_down:
+            return
+        self.rfid_lookup.Enable(True)
         try:
-            import rfid_lookup
-            rec = rfid_lookup.fetch_mouse(tag)
-            if rec:
-                self.mouse_meta = rec
-                src = 'HTTP' if 'source' in rec else 'local'
-                self.statusbar.SetStatusText(f"RFID {tag} loaded ({src})")
-            else:
-                self.mouse_meta = dict()
-                self.statusbar.SetStatusText(f"RFID {tag} not found")
+            rec = future.result()
         except Exception as e:
             self.statusbar.SetStatusText(f"RFID error: {e}")
+            return
+        if rec:
+            self.mouse_meta = rec
+            src = 'HTTP' if 'source' in rec else 'local'
+            self.statusbar.SetStatusText(f"RFID {tag} loaded ({src})")
+        else:
+            self.mouse_meta = dict()
+            self.statusbar.SetStatusText(f"RFID {tag} not found")
+        
+    def sendCom(self, val):
+        # Hand a command to the Arduino worker and wait until comFun has finished it
+        self.com_done.clear()
+        self.com.value = val
+        while self.com.value > 0:
+            if self.com_done.wait(0.5):
+                break
         
     def setProtocol(self, event):
         self.proto_str = self.protocol.GetStringSelection()
@@ -591,9 +709,7 @@ class MainFrame(wx.Frame):
         
         if self.com.value < 0:
             return
-        self.com.value = 5
-        while self.com.value > 0:
-            time.sleep(0.01)
+        self.sendCom(5)
         
     def toggleStyle(self, event):
         if self.user_cfg['deliveryStyle'] == 1:
@@ -613,9 +729,7 @@ class MainFrame(wx.Frame):
         
         if self.com.value < 0:
             return
-        self.com.value = 15
-        while self.com.value > 0:
-            time.sleep(0.01)
+        self.sendCom(15)
         
     def makeUserList(self):
         usrdatadir = os.path.dirname(os.path.realpath(__file__))
@@ -644,23 +758,27 @@ class MainFrame(wx.Frame):
         
     def autoPellet(self, event):
         if self.auto_pellet.GetValue():
-            self.com.value = 9
-            while self.com.value > 0:
-                time.sleep(0.01)
+            self.sendCom(9)
         else:
-            self.com.value = 10
-            while self.com.value > 0:
-                time.sleep(0.01)
+            self.sendCom(10)
         
     def make_delay_iters(self):
+        if self.delay_call is not None:
+            self.delay_call.Stop()
+            self.delay_call = None
         minval = int(self.tone_delay_min.GetValue())
         maxval = int(self.tone_delay_max.GetValue())
         ctval = int(self.delay_count.GetValue())
         self.delay_values = np.linspace(minval, maxval, ctval)
         np.random.shuffle(self.delay_values)
         self.first_delay = -1
-        print('New delay list:')
-        print(self.delay_values)
+            
+    def queue_delay_iters(self):
+        # Coalesce rapid spin control edits into a single rebuild
+        if self.delay_call is not None and self.delay_call.IsRunning():
+            self.delay_call.Restart(250)
+        else:
+            self.delay_call = wx.CallLater(250, self.make_delay_iters)
             
     def comFun(self, event):
       # case 'A': //servoMax
@@ -699,7 +817,7 @@ class MainFrame(wx.Frame):
         elif self.tone_delay_min == evobj:
             self.user_cfg['waitMin'] = int(self.tone_delay_min.GetValue())
             self.write_user_config()
-            self.make_delay_iters()
+            self.queue_delay_iters()
         elif self.delay_count == evobj:
             self.user_cfg['waitCt'] = int(self.delay_count.GetValue())
             self.write_user_config()
@@ -707,14 +825,14 @@ class MainFrame(wx.Frame):
                 self.tone_delay_max.Enable(False)
             else:
                 self.tone_delay_max.Enable(True)
-            self.make_delay_iters()
+            self.queue_delay_iters()
         elif self.tone_delay_max == evobj:
             self.user_cfg['waitMax'] = int(self.tone_delay_max.GetValue())
             self.write_user_config()
-            self.make_delay_iters()
+            self.queue_delay_iters()
         elif self.auto_delay == evobj:
             if self.auto_delay.GetValue():
-                self.make_delay_iters()
+                self.queue_delay_iters()
         elif self.Xmag == evobj:
             self.mVal.value = self.Xmag.GetValue()
             self.com.value = 12
@@ -746,13 +864,13 @@ class MainFrame(wx.Frame):
                 self.system_cfg['pelletXY'][0] = self.pellet_x
                 self.system_cfg['pelletXY'][1] = self.pellet_y
             elif self.set_roi.GetValue():
-                self.system_cfg['roiXWYH'] = np.ndarray.tolist(self.roi)
+                self.system_cfg['roiXWYH'] = [int(v) for v in self.roi]
             elif self.set_stim.GetValue():
-                self.system_cfg['stimXWYH'] = np.ndarray.tolist(self.stimroi)
+                self.system_cfg['stimXWYH'] = [int(v) for v in self.stimroi]
             elif self.set_crop.GetValue():
                 ndx = self.axes.index(self.cropAxes)
                 s = self.camStrList[ndx]
-                self.system_cfg[s]['crop'] = np.ndarray.tolist(self.croproi[ndx])
+                self.system_cfg[s]['crop'] = [int(v) for v in self.croproi[ndx]]
         
             clara.write_config(self.system_cfg)
             self.set_pellet_pos.SetValue(False)
@@ -819,12 +937,10 @@ class MainFrame(wx.Frame):
             self.croproi[ndx][2]+=y
             self.drawROI()
             
-            
-        if self.set_crop.GetValue():
-            ndx = self.axes.index(self.cropAxes)
-            self.croproi[ndx][0]+=x
-            self.croproi[ndx][2]+=y
-            self.drawROI()
+    def updatePelletAxes(self):
+        # vidPlayer checks this per frame; refresh whenever pelletAxes changes
+        pelletAxes = getattr(self, 'pelletAxes', None)
+        self._pellet_axes_is = [ax is pelletAxes for ax in self.axes]
             
     def drawROI(self):
         ndx = self.axes.index(self.pelletAxes)
@@ -856,69 +972,50 @@ class MainFrame(wx.Frame):
         
         
     def onClick(self,event):
-        if self.set_pellet_pos.GetValue():
-            for ndx in range(self.camCt):
-                self.pLoc[ndx].set_alpha(0.0)
-
-            self.system_cfg = clara.read_config()
-            if self.stimAxes == event.inaxes:
-                print('Stimulus camera must not be the pellet-detecting camera')
-                self.set_pellet_pos.SetValue(False)
-                self.widget_panel.Enable(True)
-                return
-            ndx = self.axes.index(event.inaxes)
-            self.pelletAxes = event.inaxes
-            self.system_cfg['axesRef'] = self.camStrList[ndx]
-            self.pellet_x = int(event.xdata)
-            self.pellet_y = int(event.ydata)
-        elif self.set_roi.GetValue():
-            for ndx in range(self.camCt):
-                self.roirec[ndx].set_alpha(0.0)
+        mode = next((m for m in self.roiModes if m[0].GetValue()), None)
+        if mode is not None:
+            toggle, artists, conflict, apply = mode
+            for a in artists:
+                a.set_alpha(0.0)
                 
             self.system_cfg = clara.read_config()
-            if self.stimAxes == event.inaxes:
-                print('Stimulus camera must not be the pellet-detecting camera')
-                self.set_roi.SetValue(False)
-                self.widget_panel.Enable(True)
-                return
-            ndx = self.axes.index(event.inaxes)
-            self.pelletAxes = event.inaxes
-            self.system_cfg['axesRef'] = self.camStrList[ndx]
-            self.roi = np.asarray(self.system_cfg['roiXWYH'], int)
-            roi_x = event.xdata
-            roi_y = event.ydata
-            self.roi = np.asarray([roi_x-self.roi[1]/2,self.roi[1],roi_y-self.roi[3]/2,self.roi[3]], int)
-        elif self.set_stim.GetValue():
-            for ndx in range(self.camCt):
-                self.stimrec[ndx].set_alpha(0.0)
-            
-            self.system_cfg = clara.read_config()
-            if self.pelletAxes == event.inaxes:
+            if conflict is not None and getattr(self, conflict, None) == event.inaxes:
                 print('Stimulus camera must not be the pellet-detecting camera')
-                self.set_stim.SetValue(False)
+                toggle.SetValue(False)
                 self.widget_panel.Enable(True)
                 return
             ndx = self.axes.index(event.inaxes)
-            self.stimAxes = event.inaxes
-            self.system_cfg['stimAxes'] = self.camStrList[ndx]
-            self.stimroi = np.asarray(self.system_cfg['stimXWYH'], int)
-            roi_x = event.xdata
-            roi_y = event.ydata
-            self.stimroi = np.asarray([roi_x-self.stimroi[1]/2,self.stimroi[1],roi_y-self.stimroi[3]/2,self.stimroi[3]], int)
-        elif self.set_crop.GetValue():
-            for ndx in range(self.camCt):
-                self.croprec[ndx].set_alpha(0.0)
-                
-            self.system_cfg = clara.read_config()
-            self.cropAxes = event.inaxes
-            ndx = self.axes.index(event.inaxes)
-            s = self.camStrList[ndx]
-            self.croproi[ndx] = self.system_cfg[s]['crop']
-            roi_x = event.xdata
-            roi_y = event.ydata
-            self.croproi[ndx] = np.asarray([roi_x-self.croproi[ndx][1]/2,self.croproi[ndx][1],
-                                            roi_y-self.croproi[ndx][3]/2,self.croproi[ndx][3]], int)
-        self.drawROI()       
+            apply(event.inaxes, ndx, event.xdata, event.ydata)
+        self.drawROI()
+        
+    def centerROI(self, xwyh, x, y):
+        # Keep the configured width/height and center the box on the click
+        w = int(xwyh[1])
+        h = int(xwyh[3])
+        return np.asarray([x-w/2,w,y-h/2,h], int)
+        
+    def clickPellet(self, ax, ndx, x, y):
+        self.pelletAxes = ax
+        self.updatePelletAxes()
+        self.system_cfg['axesRef'] = self.camStrList[ndx]
+        self.pellet_x = int(x)
+        self.pellet_y = int(y)
+        
+    def clickHandROI(self, ax, ndx, x, y):
+        self.pelletAxes = ax
+        self.updatePelletAxes()
+        self.system_cfg['axesRef'] = self.camStrList[ndx]
+        self.roi = self.centerROI(self.system_cfg['roiXWYH'], x, y)
+        
+    def clickStimROI(self, ax, ndx, x, y):
+        self.stimAxes = ax
+        self.system_cfg['stimAxes'] = self.camStrList[ndx]
+        self.stimroi = self.centerROI(self.system_cfg['stimXWYH'], x, y)
+        
+    def clickCropROI(self, ax, ndx, x, y):
+        self.cropAxes = ax
+        s = self.camStrList[ndx]
+        self.croproi[ndx] = self.centerROI(self.system_cfg[s]['crop'], x, y)
             
     def compressVid(self, event):
         ok2compress = False
@@ -927,7 +1024,9 @@ class MainFrame(wx.Frame):
                 self.mv.terminate()   
                 ok2compress = True
             else:
-                if wx.MessageBox("Compress when transfer completes?", caption="Abort", style=wx.YES_NO | wx.NO_DEFAULT | wx.ICON_QUESTION):
+                with _PausePolling(self):
+                    answer = wx.MessageBox("Compress when transfer completes?", caption="Abort", style=wx.YES_NO | wx.NO_DEFAULT | wx.ICON_QUESTION)
+                if answer:
                     while self.mv.is_alive():
                         time.sleep(10)
                     self.mv.terminate()   
@@ -944,8 +1043,8 @@ class MainFrame(wx.Frame):
                 time.sleep(10)
             self.mv.terminate()   
             
-            compressThread = compressVideos.CLARA_compress()
-            compressThread.start()
+            self.compressThread = compressVideos.CLARA_compress()
+            self.compressThread.start()
             self.compress_vid.Enable(False)
         
     def camReset(self,event):
@@ -967,9 +1066,15 @@ class MainFrame(wx.Frame):
             self.rec.SetValue(False)
             self.recordCam(event)
             
-            if wx.MessageBox("Are you sure?", caption="Abort", style=wx.YES_NO | wx.NO_DEFAULT | wx.ICON_QUESTION):
-                shutil.rmtree(self.sess_dir)
-                time.sleep(5)
+            with _PausePolling(self):
+                answer = wx.MessageBox("Are you sure?", caption="Abort", style=wx.YES_NO | wx.NO_DEFAULT | wx.ICON_QUESTION)
+            if answer:
+                # Deleting a full session can take a while; keep the GUI responsive
+                self.play.Enable(False)
+                self.statusbar.SetStatusText('Aborting... removing %s' % self.sess_dir)
+                path = self.sess_dir
+                future = self._io_pool.submit(shutil.rmtree, path)
+                future.add_done_callback(lambda f, p=path: wx.CallAfter(self.afterAbortCleanup, p, f))
             self.play.SetValue(False)
                         
         elif self.play.GetValue() == True:
@@ -980,7 +1085,7 @@ class MainFrame(wx.Frame):
                         self.pellet_status = 3
                 self.camaq.value = 1
                 self.startAq()
-                self.liveTimer.Start(150)
+                self.liveTimer.StartOnce(self.liveRate)
                 self.play.SetLabel('Stop')
             self.rec.Enable(False)
             for h in self.disable4cam:
@@ -989,13 +1094,24 @@ class MainFrame(wx.Frame):
             if self.liveTimer.IsRunning():
                 self.liveTimer.Stop()
             self.stopAq()
-            time.sleep(2)
             self.play.SetLabel('Live')
             self.rec.Enable(True)
             for h in self.disable4cam:
                 h.Enable(True)
         
-    def pelletHandler(self, pim, roi):
+    def afterAbortCleanup(self, path, future):
+        if self._shutting_down:
+            return
+        exc = future.exception()
+        if exc is None:
+            self.statusbar.SetStatusText('Session aborted')
+        else:
+            _log().error('Failed to remove %s: %s', path, exc)
+            self.statusbar.SetStatusText('Abort cleanup failed')
+        self.play.Enable(True)
+        
+    def pelletHandler(self, pim, roi, _time=time.time, _sleep=time.sleep):
+        # Hot-path callables bound as defaults to skip global lookups per frame
         # events    0 - release pellet
         #           1 - load pellet
         #           2 - waiting to lose it
@@ -1009,7 +1125,8 @@ class MainFrame(wx.Frame):
             self.autoPellet(event=None)
             dlg = wx.MessageDialog(parent=None,message="Home position failed!",
                                    caption="Warning!", style=wx.OK|wx.ICON_EXCLAMATION)
-            dlg.ShowModal()
+            with _PausePolling(self):
+                dlg.ShowModal()
             dlg.Destroy()
             return
         if self.is_busy.value == 0:
@@ -1021,39 +1138,37 @@ class MainFrame(wx.Frame):
                 # objDetected = True
             if self.pellet_status == 0:
                 print('send to mouse')
-                self.com.value = 3
-                while self.com.value > 0:
-                    time.sleep(0.01)
+                self.sendCom(3)
                     
-                self.pellet_timing = time.time()
+                self.pellet_timing = _time()
                 self.pellet_status = 1
             elif self.pellet_status == 1:
                 if self.del_style.value == 0:
                     if objDetected:
-                        self.hand_timing = time.time()
-                        self.pellet_timing = time.time()
+                        self.hand_timing = _time()
+                        self.pellet_timing = _time()
                         self.pellet_status = 2
                         self.failCt = 0
                         self.com.value = 6
-                    elif (time.time()-self.pellet_timing) > wait2detect:
+                    elif (_time()-self.pellet_timing) > wait2detect:
                         self.failCt+=1
                         if self.failCt > 3:
                             self.failCt = 0
                             beepList = [1,1,1]
                             self.auto_pellet.SetValue(0)
                             self.autoPellet(event=None)
-                            self.pellet_timing = time.time()
+                            self.pellet_timing = _time()
                             self.pellet_status = 3
                             for d in beepList: 
                                 duration = d  # seconds
                                 freq = 940  # Hz
                                 winsound.Beep(freq, duration)
-                                time.sleep(d)
+                                _sleep(d)
                         else:
                             getNewPellet = True
                 else:
-                    self.hand_timing = time.time()
-                    self.pellet_timing = time.time()
+                    self.hand_timing = _time()
+                    self.pellet_timing = _time()
                     self.pellet_status = 2
                     print("delay time")
 
@@ -1067,55 +1182,54 @@ class MainFrame(wx.Frame):
                             delayval = self.delay_values[0]/1000
                         if self.first_delay == -1:
                             self.first_delay = self.delay_values[0]
-                        if (time.time()-self.hand_timing) > delayval:
+                        if (_time()-self.hand_timing) > delayval:
                             print('Delay %d complete' % self.delay_values[0])
                             self.delay_values = np.roll(self.delay_values, shift=-1)
                             if self.first_delay == self.delay_values[0]:
                                 self.make_delay_iters()
                             reveal_pellet = True
-                    elif (time.time()-self.hand_timing) > self.user_cfg['waitAfterHand']:
+                    elif (_time()-self.hand_timing) > self.user_cfg['waitAfterHand']:
                         reveal_pellet = True
-                elif (time.time()-self.pellet_timing) > self.user_cfg['maxWait4Hand']:
+                elif (_time()-self.pellet_timing) > self.user_cfg['maxWait4Hand']:
                     getNewPellet = True
                 else:
-                    self.hand_timing = time.time()
+                    self.hand_timing = _time()
                 if reveal_pellet == True: # Reveal pellet
                     self.com.value = 4
                     if self.del_style.value == 1:
                         self.pellet_status = 4
                     else:
                         self.pellet_status = 3
-                    self.pellet_timing = time.time()
-                    self.delivery_delay = time.time()
+                    self.pellet_timing = _time()
+                    self.delivery_delay = _time()
                     if self.auto_stim.GetValue() and self.proto_str == 'First Reach':
                         self.stim_status.value = 1
                     print('revealing pellet')
                     
             elif self.pellet_status == 3: # Test whether to get new pellet
                 if not objDetected:
-                    if (time.time()-self.delivery_delay) > self.user_cfg['minTime2Eat']:
+                    if (_time()-self.delivery_delay) > self.user_cfg['minTime2Eat']:
                         getNewPellet = True
-                elif (time.time()-self.delivery_delay) > self.user_cfg['maxTime2Eat']:
+                elif (_time()-self.delivery_delay) > self.user_cfg['maxTime2Eat']:
                     getNewPellet = True
                     
             elif self.pellet_status == 4: #style B object detection listener
                 if objDetected:
                     self.com.value = 6
                     self.pellet_status = 3
-                elif (time.time()-self.pellet_timing) > wait2detect:
+                elif (_time()-self.pellet_timing) > wait2detect:
                     getNewPellet = True
                     
             if getNewPellet:
                 if self.auto_stim.GetValue() and self.proto_str == 'First Reach':
                     self.stim_status.value = 0
                 print('retrieving pellet')
-                self.com.value = 2
-                while self.com.value > 0:
-                    time.sleep(0.01)
+                self.sendCom(2)
                 self.pellet_status = 0
-                self.pellet_timing = time.time()
+                self.pellet_timing = _time()
             
-    def vidPlayer(self, event):
+    def vidPlayer(self, event, _mean=np.mean, _sum=np.sum, _asarray=np.asarray):
+        # Hot-path callables bound as defaults to skip global lookups per frame
         # Was the delivery style changed using the physical button?
         if not self.user_cfg['deliveryStyle'] == self.del_style.value:
             self.user_cfg['deliveryStyle'] = self.del_style.value
@@ -1123,36 +1237,43 @@ class MainFrame(wx.Frame):
             
         if self.camaq.value == 2:
             return
-        for ndx, im in enumerate(self.im):
-            if self.frmGrab[ndx].value == 1:
-                self.frameBuff[ndx][0:] = np.frombuffer(self.array4feed[ndx].get_obj(), self.dtype, self.size)
-                frame = self.frameBuff[ndx][0:self.dispSize[ndx]].reshape([self.aqH[ndx], self.aqW[ndx]])
-                self.frame[ndx][self.y1[ndx]:self.y2[ndx],self.x1[ndx]:self.x2[ndx]] = frame
-                im.set_data(self.frame[ndx])
+        for ndx, (im, grab, shared, fbuf, dsz, h, w, y1, y2, x1, x2, dst, s) in enumerate(self._cam_bundles):
+            if grab.value == 1:
+                fbuf[0:] = shared
+                frame = fbuf[0:dsz].reshape([h, w])
+                dst[y1:y2,x1:x2] = frame
+                im.set_data(dst)
                 if not self.pellet_x == 0:
                     if not self.roi[0] == 0:
                         if self.inspect_stim.GetValue():
-                            if self.system_cfg['stimAxes'] == self.camStrList[ndx]:
-                                print('Stimulation ROI - %d' % np.mean(np.sum(frame,axis=0)[:5]))
-                        if self.pelletAxes == self.axes[ndx]:
+                            if self.system_cfg['stimAxes'] == s:
+                                print('Stimulation ROI - %d' % _mean(_sum(frame,axis=0)[:5]))
+                        if self._pellet_axes_is[ndx]:
                             span = 6
-                            cpt = np.asarray([self.pellet_x-span,span*2+1,self.pellet_y-span,span*2+1], int)
-                            pim = self.frame[ndx][cpt[2]:cpt[2]+cpt[3],cpt[0]:cpt[0]+cpt[1]]
+                            cpt = _asarray([self.pellet_x-span,span*2+1,self.pellet_y-span,span*2+1], int)
+                            pim = dst[cpt[2]:cpt[2]+cpt[3],cpt[0]:cpt[0]+cpt[1]]
                             cpt = self.roi
-                            roi = self.frame[ndx][cpt[2]:cpt[2]+cpt[3],cpt[0]:cpt[0]+cpt[1]]
+                            roi = dst[cpt[2]:cpt[2]+cpt[3],cpt[0]:cpt[0]+cpt[1]]
                             if self.inspect_pellet.GetValue():
-                                print('Pellet ROI - %d' % np.mean(pim[:]))
+                                print('Pellet ROI - %d' % _mean(pim[:]))
                             if self.inspect_hand.GetValue():
-                                print('Hand ROI - %d' % np.mean(roi[:]))
+                                print('Hand ROI - %d' % _mean(roi[:]))
                             
                             if self.auto_pellet.GetValue():
-                                self.pelletHandler(np.mean(pim[:]),np.mean(roi[:]))
+                                self.pelletHandler(_mean(pim[:]),_mean(roi[:]))
                                 
-                self.frmGrab[ndx].value = 0
+                grab.value = 0
                 
         self.figure.canvas.draw()
         
         
+    def liveTick(self, event):
+        if self._polling_enabled:
+            self.vidPlayer(event)
+        # One-shot timer re-armed after the frame is drawn so slow draws cannot queue up ticks
+        if self.play.GetValue() and self.play.GetLabel() == 'Stop':
+            self.liveTimer.StartOnce(self.liveRate)
+        
     def autoCapture(self, event):
         self.sliderTabs+=self.sliderRate
         msg = '-'
@@ -1162,7 +1283,8 @@ class MainFrame(wx.Frame):
             self.slider.SetValue(0)
         else:
             self.slider.SetValue(round(self.sliderTabs))
-            self.vidPlayer(event)
+            if self._polling_enabled:
+                self.vidPlayer(event)
         
     def recordCam(self, event):
         if self.rec.GetValue():
@@ -1174,11 +1296,10 @@ class MainFrame(wx.Frame):
                 return
             totTime = int(self.minRec.GetValue())*60
             
-            for ndx, s in enumerate(self.camStrList):
-                camID = str(self.system_cfg[s]['serial'])
-                self.camq[camID].put('recordPrep')
-                self.camq[camID].put('none')
-                self.camq_p2read[camID].get()
+            for conn in self._cam_conns:
+                conn.send('recordPrep')
+                conn.send('none')
+                conn.recv()
             
             spaceneeded = 0
             for ndx, w in enumerate(self.aqW):
@@ -1191,35 +1312,34 @@ class MainFrame(wx.Frame):
             self.sliderTabs = 0
             self.sliderRate = 100/(totTime/(liveRate/1000))
             
-            date_string = datetime.datetime.now().strftime("%Y%m%d")
-            base_dir = os.path.join(self.system_cfg['raw_data_dir'], date_string, self.system_cfg['unitRef'])
+            pj = os.path.join
+            # One clock read for both the folder date and StartTime so they can't straddle midnight
+            now = datetime.datetime.now()
+            date_string = f'{now.year:04d}{now.month:02d}{now.day:02d}'
+            unitRef = self.system_cfg['unitRef']
+            base_dir = pj(self.system_cfg['raw_data_dir'], date_string, unitRef)
             if not os.path.exists(base_dir):
                 os.makedirs(base_dir)
-            freespace = shutil.disk_usage(base_dir)[2]
+            if hasattr(os, 'statvfs'):
+                st = os.statvfs(base_dir)
+                freespace = st.f_bavail*st.f_frsize
+            else:
+                freespace = shutil.disk_usage(base_dir).free
             if spaceneeded > freespace:
                 dlg = wx.MessageDialog(parent=None,message="There is not enough disk space for the requested duration.",
                                        caption="Warning!", style=wx.OK|wx.ICON_EXCLAMATION)
-                dlg.ShowModal()
+                with _PausePolling(self):
+                    dlg.ShowModal()
                 dlg.Destroy()
                 self.rec.SetValue(False)
                 return
             
-            prev_expt_list = [name for name in os.listdir(base_dir) if name.startswith('session')]
-            maxSess = 0;
-            for p in prev_expt_list:
-                sessNum = int(p[-3:])
-                if sessNum > maxSess:
-                    maxSess = sessNum
-            comp_dir = os.path.join(self.system_cfg['interim_data_dir'], date_string, self.system_cfg['unitRef'])
-            if os.path.exists(comp_dir):
-                prev_expt_list = [name for name in os.listdir(comp_dir) if name.startswith('session')]
-                for p in prev_expt_list:
-                    sessNum = int(p[-3:])
-                    if sessNum > maxSess:
-                        maxSess = sessNum
+            comp_dir = pj(self.system_cfg['interim_data_dir'], date_string, unitRef)
+            maxSess = max(_max_session(base_dir), _max_session(comp_dir))
             file_count = maxSess+1
             sess_string = '%s%03d' % ('session', file_count)
-            self.sess_dir = os.path.join(base_dir, sess_string)
+            prefix = f'{date_string}_{unitRef}_{sess_string}'
+            self.sess_dir = pj(base_dir, sess_string)
             if not os.path.exists(self.sess_dir):
                 os.makedirs(self.sess_dir)
             self.meta,ruamelFile = clara.metadata_template()
@@ -1230,32 +1350,31 @@ class MainFrame(wx.Frame):
             self.meta['placeholderB']='info'
             self.meta['Designer']='name'
             self.meta['Stim']=self.proto_str
-            self.meta['StartTime']=datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+            self.meta['StartTime']=f'{date_string}{now.hour:02d}{now.minute:02d}{now.second:02d}'
             self.meta['Collection']='info'
-            meta_name = '%s_%s_%s_metadata.yaml' % (date_string, self.system_cfg['unitRef'], sess_string)
-            self.metapath = os.path.join(self.sess_dir,meta_name)
+            meta_name = f'{prefix}_metadata.yaml'
+            self.metapath = pj(self.sess_dir,meta_name)
             usrdatadir = os.path.dirname(os.path.realpath(__file__))
             self.currUsr= self.user_drop.GetStringSelection()
-            usrconfigname = os.path.join(usrdatadir,'Users', f'{self.currUsr}_userdata.yaml')
-            sysconfigname = os.path.join(usrdatadir, 'systemdata.yaml')
-            usrcopyname = '%s_%s_%s_%s_userdata_copy.yaml' % (date_string, self.system_cfg['unitRef'], sess_string, self.currUsr)
-            syscopyname = '%s_%s_%s_systemdata_copy.yaml' % (date_string, self.system_cfg['unitRef'], sess_string)
-            shutil.copyfile(usrconfigname,os.path.join(self.sess_dir,usrcopyname))
-            shutil.copyfile(sysconfigname,os.path.join(self.sess_dir,syscopyname))
+            usrconfigname = pj(usrdatadir,'Users', f'{self.currUsr}_userdata.yaml')
+            sysconfigname = pj(usrdatadir, 'systemdata.yaml')
+            usrcopyname = f'{prefix}_{self.currUsr}_userdata_copy.yaml'
+            syscopyname = f'{prefix}_systemdata_copy.yaml'
+            shutil.copyfile(usrconfigname,pj(self.sess_dir,usrcopyname))
+            shutil.copyfile(sysconfigname,pj(self.sess_dir,syscopyname))
             
             
-            for ndx, s in enumerate(self.camStrList):
-                camID = str(self.system_cfg[s]['serial'])
-                name_base = '%s_%s_%s_%s' % (date_string, self.system_cfg['unitRef'], sess_string, self.system_cfg[s]['nickname'])
-                path_base = os.path.join(self.sess_dir,name_base)
-                self.camq[camID].put(path_base)
-                self.camq_p2read[camID].get()
+            # Every output file in the session shares this directory + prefix stem
+            sess_base = pj(self.sess_dir, prefix)
+            for conn, s in zip(self._cam_conns, self.camStrList):
+                path_base = f'{sess_base}_{self.system_cfg[s]["nickname"]}'
+                conn.send(path_base)
+                conn.recv()
             
             if self.com.value >= 0:
+                _drain(self.ardq_p2read)
                 self.ardq.put('recordPrep')
-                name_base = '%s_%s_%s' % (date_string, self.system_cfg['unitRef'], sess_string)
-                path_base = os.path.join(self.sess_dir,name_base)
-                self.ardq.put(path_base)
+                self.ardq.put(sess_base)
                 self.ardq_p2read.get()
                 
             for h in self.disable4cam:
@@ -1278,9 +1397,7 @@ class MainFrame(wx.Frame):
             self.play.SetLabel('Abort')
         else:
             self.compress_vid.Enable(True)
-            self.com.value = 11
-            while self.com.value > 0:
-                time.sleep(0.01)
+            self.sendCom(11)
             
             if self.com.value >= 0:
                 self.ardq.put('Stop')
@@ -1293,12 +1410,17 @@ class MainFrame(wx.Frame):
                     if 'rfid' in self.mouse_meta:
                         self.meta['RFID'] = self.mouse_meta['rfid']
                 except Exception as e:
-                    print(f'Failed to attach mouse metadata: {e}')
+                    _log().error('Failed to attach mouse metadata: %s', e)
             clara.write_metadata(self.meta, self.metapath)
             if self.recTimer.IsRunning():
                 self.recTimer.Stop()
             self.stopAq()
-            time.sleep(2)
+            if self.com.value >= 0:
+                # moveVids copies *_events.txt only once, so it must be closed before we go on
+                try:
+                    self.ardq_p2read.get(timeout=2)
+                except Empty:
+                    _log().warning('Arduino did not confirm Stop; events file may still be open')
             
             ok2move = False
             try:
@@ -1321,107 +1443,114 @@ class MainFrame(wx.Frame):
                 h.Enable(True)
     
     def initThreads(self):
-        self.camq = dict()
-        self.camq_p2read = dict()
+        # One duplex pipe per camera carries the command/acknowledge handshake;
+        # frames still go through the shared array4feed buffers.
+        self.camConn = dict()
         self.cam = list()
         for ndx, camID in enumerate(self.camIDlsit):
-            self.camq[camID] = Queue()
-            self.camq_p2read[camID] = Queue()
-            self.cam.append(spin.multiCam_DLC_Cam(self.camq[camID], self.camq_p2read[camID],
+            self.camConn[camID], child_conn = Pipe()
+            self.cam.append(spin.multiCam_DLC_Cam(child_conn,
                                                camID, self.camIDlsit,
                                                self.frmDims, self.camaq,
                                                self.frmaq, self.array4feed[ndx], self.frmGrab[ndx],
                                                self.com, self.stim_status))
             self.cam[ndx].start()
+        # camIDlsit follows camStrList order, so index-aligned with the display lists
+        self._cam_conns = [self.camConn[camID] for camID in self.camIDlsit]
             
         for m in self.mlist:
-            self.camq[m].put('InitM')
-            self.camq_p2read[m].get()
+            self.camConn[m].send('InitM')
+            self.camConn[m].recv()
         for s in self.slist:
-            self.camq[s].put('InitS')
-            self.camq_p2read[s].get()
+            self.camConn[s].send('InitS')
+            self.camConn[s].recv()
         
         self.ardq = Queue()
         self.ardq_p2read = Queue()
-        self.ard = arduino.arduinoCtrl(self.ardq, self.ardq_p2read, self.frmaq, self.com,
+        self.ard = arduino.arduinoCtrl(self.ardq, self.ardq_p2read, self.frmaq, self.com, self.com_done,
                                        self.is_busy, self.mVal, self.stim_status, self.stim_selection, self.del_style)
         self.ard.start()
         self.ardq_p2read.get()
         
     def deinitThreads(self):
-        for n, camID in enumerate(self.camIDlsit):
-            self.camq[camID].put('Release')
-            self.camq_p2read[camID].get()
-            self.camq[camID].close()
-            self.camq_p2read[camID].close()
-            self.cam[n].terminate()
+        # Release every camera first so they deinitialize in parallel, then collect the acks
+        for conn in self._cam_conns:
+            conn.send('Release')
+        for n, conn in enumerate(self._cam_conns):
+            try:
+                _recv(conn, 2)
+            except Empty:
+                pass
+            # Stop the worker before closing our end so it never reads from a dead pipe
+            _graceful_stop(self.cam[n])
+            conn.close()
         if self.com.value >= 0:
+            _drain(self.ardq_p2read)
             self.ardq.put('Release')
             self.ardq_p2read.get()
-            self.ardq.close()
-            self.ardq_p2read.close()
-            self.ard.terminate()
+        self.ardq.close()
+        self.ardq_p2read.close()
+        # A worker that never reached the Arduino spins in its loop, so stop it either way
+        _graceful_stop(self.ard)
             
     def startAq(self):
         for m in self.mlist:
-            self.camq[m].put('Start')
+            self.camConn[m].send('Start')
         for s in self.slist:
-            self.camq[s].put('Start')
+            self.camConn[s].send('Start')
         for m in self.mlist:
-            self.camq[m].put('TrigOff')
+            self.camConn[m].send('TrigOff')
         
     def stopAq(self):
         
         self.camaq.value = 0
-        for s in self.slist:
-            self.camq[s].put('Stop')
-            self.camq_p2read[s].get()
-        for m in self.mlist:
-            self.camq[m].put('Stop')
-            self.camq_p2read[m].get()
+        # Slaves are triggered by the master, so they must all finish before it stops.
+        # Within each group, send every Stop first so the cameras wind down together.
+        for camList in (self.slist, self.mlist):
+            for c in camList:
+                self.camConn[c].send('Stop')
+            for c in camList:
+                self.camConn[c].recv()
         
     def updateSettings(self, event):
         self.system_cfg = clara.read_config()
         self.aqW = list()
         self.aqH = list()
         self.recSet = list()
-        for n, camID in enumerate(self.camIDlsit):
+        if self.auto_stim.GetValue():
+            mode = 'roi'
+        elif self.crop.GetValue():
+            mode = 'crop'
+        else:
+            mode = 'full'
+        for camID, camStr in self._cam_info:
+            conn = self.camConn[camID]
             try:
-                self.camq[camID].put('updateSettings')
-                self.camq_p2read[camID].get(timeout=1)
-                if self.auto_stim.GetValue():
-                    self.camq[camID].put('roi')
-                elif self.crop.GetValue():
-                    self.camq[camID].put('crop')
-                else:
-                    self.camq[camID].put('full')
+                conn.send('updateSettings')
+                _recv(conn, 1)
+                conn.send(mode)
             
-                self.recSet.append(self.camq_p2read[camID].get(timeout=4))
-                aqW = self.camq_p2read[camID].get(timeout=1)
-                self.aqW.append(int(aqW))
-                aqH = self.camq_p2read[camID].get(timeout=1)
-                self.aqH.append(int(aqH))
+                recSet = _recv(conn, 4)
+                aqW = _recv(conn, 1)
+                aqH = _recv(conn, 1)
                 
             except:
                 print('\nTrying to fix.  Please wait...\n')
                 self.deinitThreads()
                 self.camReset(event)
                 self.initThreads()
-                self.camq[camID].put('updateSettings')
-                self.camq_p2read[camID].get()
-                if self.auto_stim.GetValue():
-                    self.camq[camID].put('roi')
-                elif self.crop.GetValue():
-                    self.camq[camID].put('crop')
-                else:
-                    self.camq[camID].put('full')
+                conn = self.camConn[camID]
+                conn.send('updateSettings')
+                conn.recv()
+                conn.send(mode)
             
-                self.recSet.append(self.camq_p2read[camID].get())
-                aqW = self.camq_p2read[camID].get()
-                self.aqW.append(int(aqW))
-                aqH = self.camq_p2read[camID].get()
-                self.aqH.append(int(aqH))
-            print('frame rate ' + self.camStrList[n] + ' : ' + str(round(self.recSet[n])))
+                recSet = conn.recv()
+                aqW = conn.recv()
+                aqH = conn.recv()
+            self.recSet.append(recSet)
+            self.aqW.append(int(aqW))
+            self.aqH.append(int(aqH))
+            print('frame rate ' + camStr + ' : ' + str(round(recSet)))
                 
     def initCams(self, event):
         if self.init.GetValue() == True:
@@ -1430,52 +1559,45 @@ class MainFrame(wx.Frame):
             self.initThreads()
             self.updateSettings(event)
             
-            self.Bind(wx.EVT_TIMER, self.vidPlayer, self.liveTimer)
+            self.Bind(wx.EVT_TIMER, self.liveTick, self.liveTimer)
             
             self.camaq.value = 1
             self.startAq()
             time.sleep(1)
             self.camaq.value = 0
             self.stopAq()
-            self.x1 = list()
-            self.x2 = list()
-            self.y1 = list()
-            self.y2 = list()
-            self.h = list()
-            self.w = list()
-            self.dispSize = list()
+            camCount = len(self.im)
+            self.x1 = np.empty(camCount, np.int32)
+            self.y1 = np.empty(camCount, np.int32)
+            self.h = np.empty(camCount, np.int32)
+            self.w = np.empty(camCount, np.int32)
+            self._shared_view = list()
             for ndx, im in enumerate(self.im):
                 self.frame[ndx] = np.zeros(self.shape, dtype='ubyte')
-                self.frameBuff[ndx][0:] = np.frombuffer(self.array4feed[ndx].get_obj(), self.dtype, self.size)
+                self._shared_view.append(np.frombuffer(self.array4feed[ndx].get_obj(), self.dtype, self.size))
+                self.frameBuff[ndx][0:] = self._shared_view[ndx]
                 if self.auto_stim.GetValue() and self.stimAxes == self.axes[ndx]:
-                    self.h.append(self.stimroi[3])
-                    self.w.append(self.stimroi[1])
-                    self.y1.append(self.stimroi[2])
-                    self.x1.append(self.stimroi[0])
+                    self.x1[ndx], self.w[ndx], self.y1[ndx], self.h[ndx] = self.stimroi[:4]
                     self.set_stim.Enable(False)
                     self.set_crop.Enable(False)
                     self.inspect_stim.Enable(True)
                 elif self.crop.GetValue():
-                    self.h.append(self.croproi[ndx][3])
-                    self.w.append(self.croproi[ndx][1])
-                    self.y1.append(self.croproi[ndx][2])
-                    self.x1.append(self.croproi[ndx][0])
+                    self.x1[ndx], self.w[ndx], self.y1[ndx], self.h[ndx] = self.croproi[ndx][:4]
                     self.set_crop.Enable(False)
                     self.set_stim.Enable(True)
                     self.inspect_stim.Enable(False)
                 else:
-                    self.h.append(self.frmDims[1])
-                    self.w.append(self.frmDims[3])
-                    self.y1.append(self.frmDims[0])
-                    self.x1.append(self.frmDims[2])
+                    self.y1[ndx], self.h[ndx], self.x1[ndx], self.w[ndx] = self.frmDims[:4]
                     self.set_crop.Enable(True)
                     self.set_stim.Enable(True)
                     self.inspect_stim.Enable(False)
-                
-                self.dispSize.append(self.aqH[ndx]*self.aqW[ndx])
-                self.y2.append(self.y1[ndx]+self.aqH[ndx])
-                self.x2.append(self.x1[ndx]+self.aqW[ndx])
-                
+            
+            aqH = np.asarray(self.aqH, np.int32)
+            aqW = np.asarray(self.aqW, np.int32)
+            self.y2 = self.y1 + aqH
+            self.x2 = self.x1 + aqW
+            self.dispSize = aqH * aqW
+            for ndx, im in enumerate(self.im):
                 frame = self.frameBuff[ndx][0:self.dispSize[ndx]].reshape([self.aqH[ndx], self.aqW[ndx]])
                 self.frame[ndx][self.y1[ndx]:self.y2[ndx],self.x1[ndx]:self.x2[ndx]] = frame
                 im.set_data(self.frame[ndx])
@@ -1494,6 +1616,12 @@ class MainFrame(wx.Frame):
                     if self.stimAxes == self.axes[ndx]:
                         self.stimrec[ndx].set_alpha(0.6)
             
+            # Per-camera handles for vidPlayer, rebuilt whenever the cameras are initialized
+            self._cam_bundles = list(zip(self.im, self.frmGrab, self._shared_view, self.frameBuff,
+                                         self.dispSize.tolist(), self.aqH, self.aqW,
+                                         self.y1.tolist(), self.y2.tolist(),
+                                         self.x1.tolist(), self.x2.tolist(),
+                                         self.frame, self.camStrList))
             self.init.SetLabel('Release')
             self.crop.Enable(False)
             self.auto_stim.Enable(False)
@@ -1507,21 +1635,11 @@ class MainFrame(wx.Frame):
                     self.make_delay_iters()
                 self.setProtocol(None)
                 self.setDelStyle()
-                self.com.value = 7 # block ButtonStyleChange
-                while self.com.value > 0:
-                    time.sleep(0.01)
-                self.com.value = 12 # set X position
-                while self.com.value > 0:
-                    time.sleep(0.01)
-                self.com.value = 13 # set Y position
-                while self.com.value > 0:
-                    time.sleep(0.01)
-                self.com.value = 14 # set Z position
-                while self.com.value > 0:
-                    time.sleep(0.01)
-                self.com.value = 1 # send home
-                while self.com.value > 0:
-                    time.sleep(0.01)
+                self.sendCom(7) # block ButtonStyleChange
+                self.sendCom(12) # set X position
+                self.sendCom(13) # set Y position
+                self.sendCom(14) # set Z position
+                self.sendCom(1) # send home
                     
                 
                 for h in self.serHlist:
@@ -1531,9 +1649,7 @@ class MainFrame(wx.Frame):
             self.figure.canvas.draw()
         else:
             if not self.com.value < 0:
-                self.com.value = 8 # allowButtonStyleChange
-                while self.com.value > 0:
-                    time.sleep(0.01)
+                self.sendCom(8) # allowButtonStyleChange
                     
             if self.play.GetValue():
                 self.play.SetValue(False)
@@ -1569,6 +1685,9 @@ class MainFrame(wx.Frame):
         """
         Quits the GUI
         """
+        if self.quitTimer.IsRunning():
+            # Already waiting on compression to finish
+            return
         print('Close event called')
         if self.play.GetValue():
             self.play.SetValue(False)
@@ -1582,26 +1701,47 @@ class MainFrame(wx.Frame):
         
         try:
             if not self.mv.is_alive():
-                self.mv.terminate()
+                _graceful_stop(self.mv)
             else:
                 print('File transfer in progress...\n')
                 print('Do not record again until transfer completes.\n')
-        except:
-            pass
+        except AttributeError:
+            pass  # nothing was recorded this session
+        except Exception as e:
+            _log().error('Failed to stop file transfer: %s', e)
         
         try:
             if self.compressThread.is_alive():
-                dlg = wx.MessageDialog(parent=None,message="Pausing until previous compression completes!",
-                                       caption="Warning!", style=wx.OK|wx.ICON_EXCLAMATION)
-                dlg.ShowModal()
-                dlg.Destroy()
-                while self.compressThread.is_alive():
-                    time.sleep(10)
-            
-            self.compressThread.terminate()   
-        except:
-            pass
+                # Poll from a timer so the event loop keeps running while compression finishes.
+                # The cameras are already released, so lock the controls until the frame goes away.
+                self.widget_panel.Enable(False)
+                self.statusbar.SetStatusText("Pausing until previous compression completes...")
+                self.Bind(wx.EVT_TIMER, self.quitPoll, self.quitTimer)
+                self.quitTimer.Start(200)
+                return
+        except AttributeError:
+            pass  # nothing was compressed this session
+        except Exception as e:
+            _log().error('Failed to check compression process: %s', e)
+        self.finishQuit()
         
+    def quitPoll(self, event):
+        if self.compressThread.is_alive():
+            return
+        self.quitTimer.Stop()
+        self.finishQuit()
+        
+    def finishQuit(self):
+        compressThread = getattr(self, 'compressThread', None)
+        if compressThread is not None:
+            _graceful_stop(compressThread)
+        
+        # Results from the I/O pool arrive via wx.CallAfter and may land after Destroy;
+        # the after* handlers check this flag before touching any widget.
+        self._shutting_down = True
+        if self.delay_call is not None:
+            self.delay_call.Stop()
+        self._io_pool.shutdown(wait=True)
         self.statusbar.SetStatusText("")
         self.Destroy()
     
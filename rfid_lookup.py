@@ -8,13 +8,16 @@ from typing import Optional, Dict
 API_URL = "http://127.0.0.1:8080"  # FastAPI default we suggest
 TIMEOUT = 1.5
 
+# Keep-alive session so repeated lookups reuse the connection to the local API
+_session = requests.Session()
+
 def fetch_mouse(rfid: str) -> Optional[Dict]:
     rfid = rfid.strip()
     if not rfid:
         return None
     # Try HTTP
     try:
-        r = requests.get(f"{API_URL}/mouse/{rfid}", timeout=TIMEOUT)
+        r = _session.get(f"{API_URL}/mouse/{rfid}", timeout=TIMEOUT)
         if r.status_code == 200:
             return r.json()
     except Exception:
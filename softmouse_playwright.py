@@ -10,6 +10,7 @@ Env variables expected:
 Usage (after installing playwright and browsers):
   playwright install
   python softmouse_playwright.py --login-only
+  python softmouse_playwright.py --login-only --persistent-profile .pw_profile
 
 Future steps:
   - Implement navigation to import template page
@@ -27,32 +28,45 @@ except Exception:
 
 BASE_URL = 'https://app.softmouse.net'  # Placeholder; adjust to actual portal
 
-async def login(page):
+async def login(page, allow_existing: bool = False):
     await page.goto(BASE_URL)
+    if allow_existing and await page.query_selector('#password') is None:
+        return  # persistent profile still holds a valid session
     # Placeholder selectors; replace with real ones after inspecting the page
     await page.fill('#username', os.getenv('SOFTMOUSE_USER',''))
     await page.fill('#password', os.getenv('SOFTMOUSE_PASSWORD',''))
     await page.click('button[type=submit]')
-    await page.wait_for_load_state('networkidle')
+    # Done once the login form goes away (navigation or in-page swap); resolves on the DOM
+    # change instead of waiting out 'networkidle's quiet period, and times out on bad creds.
+    await page.wait_for_selector('#password', state='detached')
 
 async def main_async(args):
     if async_playwright is None:
         raise SystemExit('Playwright not installed. Run: pip install playwright && playwright install')
     async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=not args.headful)
-        ctx = await browser.new_context()
-        page = await ctx.new_page()
-        await login(page)
+        if args.persistent_profile:
+            # Disk cache, cookies and HTTP state carry over between runs
+            ctx = await pw.chromium.launch_persistent_context(args.persistent_profile, headless=not args.headful)
+            page = ctx.pages[0] if ctx.pages else await ctx.new_page()
+        else:
+            browser = await pw.chromium.launch(headless=not args.headful)
+            ctx = await browser.new_context()
+            page = await ctx.new_page()
+        await login(page, allow_existing=bool(args.persistent_profile))
         if args.login_only:
             print('Logged in (placeholder).')
         # Future: perform patch application steps here.
-        await browser.close()
+        if args.persistent_profile:
+            await ctx.close()
+        else:
+            await browser.close()
 
 
 def main(argv=None):
     ap = argparse.ArgumentParser()
     ap.add_argument('--login-only', action='store_true')
     ap.add_argument('--headful', action='store_true', help='Run non-headless for debugging')
+    ap.add_argument('--persistent-profile', metavar='DIR', help='Reuse a Chromium profile dir (cache + session) across runs')
     args = ap.parse_args(argv)
     asyncio.run(main_async(args))
 
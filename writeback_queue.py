@@ -20,7 +20,7 @@ Usage:
 """
 from __future__ import annotations
 import argparse, json, pathlib, datetime
-from typing import Dict, Any, List, Iterable
+from typing import Dict, Any, List, Iterable, Iterator, Tuple
 
 QUEUE_FILE = pathlib.Path('writeback_queue.jsonl')
 
@@ -36,17 +36,22 @@ def enqueue(op: str, rfid: str, changes: Dict[str, Any]):
     return rec
 
 
-def load_all() -> List[Dict[str,Any]]:
+def iter_all() -> Iterator[Dict[str,Any]]:
+    """Stream queue records one line at a time."""
     if not QUEUE_FILE.exists():
-        return []
-    out = []
+        return
     with QUEUE_FILE.open('r', encoding='utf-8') as f:
         for line in f:
             line=line.strip()
             if not line:
                 continue
-            out.append(json.loads(line))
-    return out
+            yield json.loads(line)
+
+def iter_pending() -> Iterator[Dict[str,Any]]:
+    return (r for r in iter_all() if r.get('status') == 'pending')
+
+def load_all() -> List[Dict[str,Any]]:
+    return list(iter_all())
 
 def write_all(recs: Iterable[Dict[str,Any]]):
     tmp = QUEUE_FILE.with_suffix('.tmp')
@@ -55,22 +60,38 @@ def write_all(recs: Iterable[Dict[str,Any]]):
             f.write(json.dumps(r) + '\n')
     tmp.replace(QUEUE_FILE)
 
-def mark_processed(rfid: str, op: str, status: str, error: str | None = None):
+def mark_processed_many(updates: Iterable[Tuple[str, str, str, str | None]]) -> int:
+    """Apply (rfid, op, status, error) updates with a single rewrite of the queue file.
+
+    Each update marks the oldest still-open (pending/processing) record for its rfid/op,
+    same as calling mark_processed for each in turn. Returns the number of records changed.
+    """
     recs = load_all()
-    changed = False
-    now = utcnow()
+    open_recs: Dict[Tuple[str, str], List[Dict[str,Any]]] = {}
     for r in recs:
-        if r.get('rfid') == rfid and r.get('op') == op and r.get('status') in ('pending','processing'):
-            r['status'] = status
-            r['processed_at'] = now
-            if error:
-                r['error'] = error
-            changed = True
-            break
+        if r.get('status') in ('pending','processing'):
+            open_recs.setdefault((r.get('rfid'), r.get('op')), []).append(r)
+    now = utcnow()
+    changed = 0
+    for rfid, op, status, error in updates:
+        waiting = open_recs.get((rfid, op))
+        if not waiting:
+            continue
+        r = waiting[0]
+        r['status'] = status
+        r['processed_at'] = now
+        if error:
+            r['error'] = error
+        if status not in ('pending','processing'):
+            waiting.pop(0)
+        changed += 1
     if changed:
         write_all(recs)
     return changed
 
+def mark_processed(rfid: str, op: str, status: str, error: str | None = None):
+    return mark_processed_many([(rfid, op, status, error)]) > 0
+
 
 def parse_changes(pairs: list[str]) -> Dict[str,Any]:
     changes = {}
@@ -102,7 +123,7 @@ def main(argv=None):
         rec = enqueue(args.op, args.rfid, parse_changes(args.change))
         print('Enqueued:', json.dumps(rec))
     elif args.cmd == 'list':
-        for r in load_all():
+        for r in iter_all():
             print(json.dumps(r))
     elif args.cmd == 'mark':
         ok = mark_processed(args.rfid, args.op, args.status, args.error)